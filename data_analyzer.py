@@ -1,7 +1,41 @@
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+import ahocorasick
 from typing import Dict, List, Optional, Union
 import re
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+def _all(*keywords: str) -> re.Pattern:
+    """Compile a pattern that matches when every keyword appears, in any order"""
+    return re.compile('^' + ''.join(f'(?=.*{re.escape(k)})' for k in keywords), re.DOTALL)
+
+def normalize_question(question: str) -> str:
+    """Lowercase a question, collapse whitespace and drop trailing punctuation"""
+    return ' '.join(question.lower().split()).rstrip('?!. ')
+
+# (pattern, match against the question with spaces removed, handler), in priority order
+_ROUTES = [
+    (_all('how many employees', 'department'), False, '_handle_department_count'),
+    (_all('salary of'), False, '_handle_employee_salary'),
+    (_all('highest salary'), False, '_handle_highest_salary'),
+    (_all('how many sales', 'february'), False, '_handle_sales_count'),
+    (_all('hired most recently'), False, '_handle_recent_hire'),
+    (_all('feedbackscore'), True, '_handle_feedback_score'),
+    (_all('which department'), False, '_handle_employee_department'),
+    (_all('salesamount'), True, '_handle_sale_amount'),
+    (_all('needs improvement'), False, '_handle_needs_improvement'),
+    (_all('total sales amount', 'january'), False, '_handle_total_sales'),
+    (_all('highest total sales'), False, '_handle_top_sales_employee'),
+    (_all('average salary', 'department'), False, '_handle_avg_salary'),
+    (_all('howmanyemployees', 'feedbackscore'), True, '_handle_feedback_count'),
+    (_all('total payroll'), False, '_handle_total_payroll'),
+    (_all('highest total sales', 'month'), False, '_handle_top_sales_month'),
+    (_all('averagefeedbackscore'), True, '_handle_avg_feedback'),
+    (_all('lowest average salary'), False, '_handle_lowest_avg_salary'),
+    (_all('hired before'), False, '_handle_employees_before_year'),
+    (_all('most feedback entries'), False, '_handle_most_feedback'),
+]
 
 @dataclass
 class SheetInfo:
@@ -13,335 +47,474 @@ class DataAnalyzer:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.sheets = self._load_all_sheets()
-        self._preprocess_data()
-        self._create_relationships()
+        # Per instance, so cached answers never outlive the data they were computed from
+        self._query_cached = lru_cache(maxsize=256)(self._route_query)
     
     def _load_all_sheets(self) -> Dict[str, SheetInfo]:
         """Load all sheets from Excel or single sheet from CSV"""
         sheets = {}
         
         if self.file_path.endswith('.csv'):
-            data = pd.read_csv(self.file_path)
+            data = pd.read_csv(self.file_path, engine='pyarrow', dtype_backend='pyarrow')
             sheet_info = self._analyze_sheet('data', data)
             sheets['data'] = sheet_info
         else:
+            # One open workbook serves every sheet instead of re-parsing the file per sheet
             with pd.ExcelFile(self.file_path) as xls:
                 for sheet_name in xls.sheet_names:
-                    data = pd.read_excel(xls, sheet_name)
+                    data = pd.read_excel(xls, sheet_name=sheet_name)
                     sheets[sheet_name] = self._analyze_sheet(sheet_name, data)
         return sheets
     
     def _analyze_sheet(self, sheet_name: str, data: pd.DataFrame) -> SheetInfo:
-        """Analyze a single sheet's structure"""
+        """Analyze a single sheet's structure and clean its columns in one pass"""
         column_types = {
             'numeric': [],
             'categorical': [],
             'date': [],
             'id': []
         }
+        numeric_cols = set(data.select_dtypes(include=['number', 'bool']).columns)
         
         for col in data.columns:
             col_str = str(col).lower()
             
-            if pd.api.types.is_numeric_dtype(data[col]):
+            if col in numeric_cols:
+                if pd.api.types.is_integer_dtype(data[col]):
+                    data[col] = pd.to_numeric(data[col], downcast='integer')
                 column_types['numeric'].append(col)
             elif pd.api.types.is_datetime64_any_dtype(data[col]):
                 column_types['date'].append(col)
             else:
-                try:
-                    data[col] = pd.to_datetime(data[col])
+                parsed = self._parse_dates(data[col])
+                if parsed is not None:
+                    data[col] = parsed
                     column_types['date'].append(col)
-                except:
+                else:
                     column_types['categorical'].append(col)
+                    if pd.api.types.is_string_dtype(data[col]):
+                        data[col] = data[col].astype(str).str.strip()
+                    # Low-cardinality text groups and compares faster as integer codes
+                    if len(data) and data[col].nunique() / len(data) < 0.5:
+                        data[col] = data[col].astype('category')
             
-            if re.match(r'.*id.*', col_str) and not re.match(r'.*idea.*', col_str):
+            if 'id' in col_str and 'idea' not in col_str:
                 column_types['id'].append(col)
         
         return SheetInfo(name=sheet_name, data=data, column_types=column_types)
     
-    def _preprocess_data(self):
-        """Clean and preprocess data across all sheets"""
-        for sheet in self.sheets.values():
-            for col in sheet.data.columns:
-                if pd.api.types.is_numeric_dtype(sheet.data[col]):
-                    sheet.data[col] = pd.to_numeric(sheet.data[col], errors='coerce')
-                elif pd.api.types.is_string_dtype(sheet.data[col]):
-                    sheet.data[col] = sheet.data[col].astype(str).str.strip()
-    
-    def _create_relationships(self):
-        """Create merged views of related data"""
-        if 'Employees' in self.sheets and 'Sales' in self.sheets:
-            self.employee_sales = pd.merge(
-                self.sheets['Employees'].data,
-                self.sheets['Sales'].data,
-                on='EmployeeID',
-                how='left'
-            )
+    def _parse_dates(self, column: pd.Series) -> Optional[pd.Series]:
+        """Parse a text column as dates, or return None if it isn't one"""
+        sample = column.dropna().astype(str).head(20)
+        if sample.empty or sample.str.match(r'^\d').mean() < 0.5:
+            return None
         
-        if 'Employees' in self.sheets and 'Feedback' in self.sheets:
-            self.employee_feedback = pd.merge(
-                self.sheets['Employees'].data,
-                self.sheets['Feedback'].data,
-                on='EmployeeID',
-                how='left'
-            )
+        # Probe a small sample for a single format instead of parsing every cell with dateutil
+        try:
+            pd.to_datetime(sample, format='ISO8601')
+            date_format = 'ISO8601'
+        except (ValueError, TypeError):
+            date_format = guess_datetime_format(sample.iloc[0])
+            if date_format is None:
+                return None
+        
+        parsed = pd.to_datetime(column, format=date_format, errors='coerce')
+        # Only a date column if every non-null value parsed
+        if (parsed.notna() | column.isna()).all():
+            return parsed
+        return None
+    
+    @cached_property
+    def employee_sales(self) -> pd.DataFrame:
+        """Employees merged with their sales, built on first access"""
+        return pd.merge(
+            self.sheets['Employees'].data,
+            self.sheets['Sales'].data,
+            on='EmployeeID',
+            how='left',
+            validate='one_to_many',
+            sort=False
+        )
+    
+    @cached_property
+    def employee_feedback(self) -> pd.DataFrame:
+        """Employees merged with their feedback, built on first access"""
+        return pd.merge(
+            self.sheets['Employees'].data,
+            self.sheets['Feedback'].data,
+            on='EmployeeID',
+            how='left',
+            validate='one_to_many',
+            sort=False
+        )
+    
+    @cached_property
+    def _emp_sales_totals(self) -> pd.Series:
+        """Total sales per employee name"""
+        return self.employee_sales.groupby('Name', sort=False, observed=True)['SalesAmount'].sum()
+    
+    # Lookup structures used by query(), each built on first use so a sheet
+    # missing a column only disables the questions that need it
+    @cached_property
+    def _emp_by_name(self) -> pd.DataFrame:
+        """Employees indexed by name"""
+        return self.sheets['Employees'].data.drop_duplicates('Name').set_index('Name', drop=False)
+    
+    @cached_property
+    def _emp_by_id(self) -> pd.DataFrame:
+        """Employees indexed by EmployeeID"""
+        return self.sheets['Employees'].data.drop_duplicates('EmployeeID').set_index('EmployeeID', drop=False)
+    
+    @cached_property
+    def _dept_groups(self) -> Dict:
+        """Employee row labels per department"""
+        return self.sheets['Employees'].data.groupby('Department', observed=True).groups
+    
+    @cached_property
+    def _name_matcher(self) -> Optional[ahocorasick.Automaton]:
+        """Matcher for employee names"""
+        return self._build_matcher(self.sheets['Employees'].data['Name'].unique())
+    
+    @cached_property
+    def _dept_matcher(self) -> Optional[ahocorasick.Automaton]:
+        """Matcher for department names"""
+        return self._build_matcher(self.sheets['Employees'].data['Department'].unique())
+    
+    @cached_property
+    def _salary_max_row(self) -> pd.Series:
+        """Employee with the highest salary"""
+        employees = self.sheets['Employees'].data
+        return employees.loc[employees['Salary'].idxmax()]
+    
+    @cached_property
+    def _dept_salary_avg(self) -> pd.Series:
+        """Average salary per department"""
+        return self.sheets['Employees'].data.groupby('Department', observed=True)['Salary'].mean()
+    
+    @cached_property
+    def _total_payroll(self):
+        """Sum of all salaries"""
+        return self.sheets['Employees'].data['Salary'].sum()
+    
+    @cached_property
+    def _hire_years(self) -> pd.Series:
+        """Hire year per employee"""
+        # HireDate is normally parsed at load; coerce here once in case it wasn't
+        hire_years = pd.to_datetime(self.sheets['Employees'].data['HireDate'], errors='coerce', format='mixed').dt.year
+        return hire_years.astype('int16') if hire_years.notna().all() else hire_years
+    
+    @cached_property
+    def _sales_by_id(self) -> pd.DataFrame:
+        """Sales indexed by SaleID"""
+        return self.sheets['Sales'].data.drop_duplicates('SaleID').set_index('SaleID')
+    
+    @cached_property
+    def _monthly_sales(self) -> pd.Series:
+        """Total sales amount per month"""
+        return self.sheets['Sales'].data.groupby('Month', observed=True)['SalesAmount'].sum()
+    
+    @cached_property
+    def _feedback_by_empid(self) -> pd.DataFrame:
+        """First feedback entry per EmployeeID"""
+        return self.sheets['Feedback'].data.drop_duplicates('EmployeeID').set_index('EmployeeID')
+    
+    @cached_property
+    def _feedback_counts(self) -> pd.Series:
+        """Number of feedback entries per EmployeeID"""
+        return self.sheets['Feedback'].data.groupby('EmployeeID').size()
+    
+    @cached_property
+    def _score_counts(self) -> pd.Series:
+        """Number of feedback entries per FeedbackScore"""
+        return self.sheets['Feedback'].data['FeedbackScore'].value_counts()
+    
+    @cached_property
+    def _needs_improvement_mask(self) -> pd.Series:
+        """Feedback rows whose comment mentions 'Needs Improvement'"""
+        comments = self.sheets['Feedback'].data['Comments']
+        if isinstance(comments.dtype, pd.CategoricalDtype):
+            # One substring test per distinct comment, broadcast back through the codes
+            categories = comments.cat.categories
+            matching = categories[categories.astype(str).str.contains('Needs Improvement', case=False, regex=False)]
+            return comments.isin(matching)
+        if pd.api.types.is_string_dtype(comments) or comments.dtype == object:
+            return comments.astype(str).str.contains('Needs Improvement', case=False, regex=False, na=False) & comments.notna()
+        # An all-blank column is read as float64 and has no text to match
+        return pd.Series(False, index=comments.index)
     
     def query(self, question: str) -> Dict:
         """Main query interface for all analysis"""
-        question_lower = question.lower()
-        
-        # Department count questions
-        if 'how many employees' in question_lower and 'department' in question_lower:
-            dept = self._extract_department(question)
-            if dept:
-                count = len(self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Department'] == dept
-                ])
-                names = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Department'] == dept
-                ]['Name'].tolist()
-                return {
-                    'type': 'department_count',
-                    'department': dept,
-                    'count': count,
-                    'names': names
-                }
+        result = dict(self._query_cached(normalize_question(question)))
+        if result['type'] == 'unhandled':
+            result['question'] = question
+        return result
+    
+    def _route_query(self, question: str) -> tuple:
+        """Dispatch a normalized question to its handler, as a hashable result"""
+        # Results are shared through the cache, so handlers return tuples rather than lists
+        # Some routes match against the question with spaces removed
+        question_nospace = question.replace(' ', '')
         
-        # Individual salary questions
-        elif 'salary of' in question_lower:
-            name = self._extract_name(question)
-            if name:
-                salary = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Name'] == name
-                ]['Salary'].values[0]
-                return {
-                    'type': 'employee_salary',
-                    'name': name,
-                    'salary': salary
-                }
+        # Only the first matching route is tried, mirroring the old elif chain
+        for pattern, nospace, handler in _ROUTES:
+            if pattern.search(question_nospace if nospace else question):
+                result = getattr(self, handler)(question)
+                if result is not None:
+                    return tuple(result.items())
+                break
         
-        # Highest salary question
-        elif 'highest salary' in question_lower:
-            max_salary = self.sheets['Employees'].data['Salary'].max()
-            employee = self.sheets['Employees'].data[
-                self.sheets['Employees'].data['Salary'] == max_salary
-            ].iloc[0]
-            return {
-                'type': 'highest_salary',
-                'name': employee['Name'],
-                'salary': employee['Salary'],
-                'department': employee['Department']
-            }
-        
-        # Sales count questions
-        elif 'how many sales' in question_lower and 'february' in question_lower:
-            feb_sales = self.sheets['Sales'].data[
-                self.sheets['Sales'].data['Month'] == '2025-02'
-            ]
+        return (('type', 'unhandled'), ('question', question))
+    
+    def _handle_department_count(self, question: str) -> Optional[Dict]:
+        """Department count questions"""
+        dept = self._extract_department(question)
+        if dept:
+            rows = self._dept_groups[dept]
+            count = len(rows)
+            names = tuple(self.sheets['Employees'].data.loc[rows, 'Name'].tolist())
             return {
-                'type': 'sales_count',
-                'month': 'February 2025',
-                'count': len(feb_sales),
-                'sale_ids': feb_sales['SaleID'].tolist()
+                'type': 'department_count',
+                'department': dept,
+                'count': count,
+                'names': names
             }
-        
-        # Recent hire question
-        elif 'hired most recently' in question_lower:
-            recent = self.sheets['Employees'].data.sort_values('HireDate', ascending=False).iloc[0]
+        return None
+    
+    def _handle_employee_salary(self, question: str) -> Optional[Dict]:
+        """Individual salary questions"""
+        name = self._extract_name(question)
+        if name:
+            salary = self._emp_by_name.at[name, 'Salary']
             return {
-                'type': 'recent_hire',
-                'name': recent['Name'],
-                'hire_date': recent['HireDate'],
-                'department': recent['Department']
+                'type': 'employee_salary',
+                'name': name,
+                'salary': salary
             }
-        
-        # Feedback score questions
-        elif 'feedbackscore' in question_lower.replace(' ', ''):
-            name = self._extract_name(question)
-            if name:
-                employee_id = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Name'] == name
-                ]['EmployeeID'].values[0]
-                feedback = self.sheets['Feedback'].data[
-                    self.sheets['Feedback'].data['EmployeeID'] == employee_id
-                ]
-                if not feedback.empty:
-                    return {
-                        'type': 'feedback_score',
-                        'name': name,
-                        'score': feedback['FeedbackScore'].values[0],
-                        'comment': feedback['Comments'].values[0]
-                    }
-        
-        # Department lookup questions
-        elif 'which department' in question_lower:
-            name = self._extract_name(question)
-            if name:
-                dept = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Name'] == name
-                ]['Department'].values[0]
+        return None
+    
+    def _handle_highest_salary(self, question: str) -> Optional[Dict]:
+        """Highest salary question"""
+        employee = self._salary_max_row
+        return {
+            'type': 'highest_salary',
+            'name': employee['Name'],
+            'salary': employee['Salary'],
+            'department': employee['Department']
+        }
+    
+    def _handle_sales_count(self, question: str) -> Optional[Dict]:
+        """Sales count questions"""
+        feb_sales = self.sheets['Sales'].data[
+            self.sheets['Sales'].data['Month'] == '2025-02'
+        ]
+        return {
+            'type': 'sales_count',
+            'month': 'February 2025',
+            'count': len(feb_sales),
+            'sale_ids': tuple(feb_sales['SaleID'].tolist())
+        }
+    
+    def _handle_recent_hire(self, question: str) -> Optional[Dict]:
+        """Recent hire question"""
+        employees = self.sheets['Employees'].data
+        recent = employees.loc[employees['HireDate'].idxmax()]
+        return {
+            'type': 'recent_hire',
+            'name': recent['Name'],
+            'hire_date': recent['HireDate'],
+            'department': recent['Department']
+        }
+    
+    def _handle_feedback_score(self, question: str) -> Optional[Dict]:
+        """Feedback score questions"""
+        name = self._extract_name(question)
+        if name:
+            employee_id = self._emp_by_name.at[name, 'EmployeeID']
+            if employee_id in self._feedback_by_empid.index:
                 return {
-                    'type': 'employee_department',
+                    'type': 'feedback_score',
                     'name': name,
-                    'department': dept
-                }
-        
-        # Sales amount questions
-        elif 'salesamount' in question_lower.replace(' ', ''):
-            if 'saleid' in question_lower.replace(' ', ''):
-                sale_id = int(re.search(r'saleid\s*(\d+)', question_lower).group(1))
-                amount = self.sheets['Sales'].data[
-                    self.sheets['Sales'].data['SaleID'] == sale_id
-                ]['SalesAmount'].values[0]
-                return {
-                    'type': 'sale_amount',
-                    'sale_id': sale_id,
-                    'amount': amount
-                }
-        
-        # Needs improvement feedback
-        elif 'needs improvement' in question_lower:
-            feedback = self.sheets['Feedback'].data[
-                self.sheets['Feedback'].data['Comments'].str.contains('Needs Improvement', case=False)
-            ]
-            if not feedback.empty:
-                employee_id = feedback['EmployeeID'].values[0]
-                employee = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['EmployeeID'] == employee_id
-                ].iloc[0]
-                return {
-                    'type': 'needs_improvement',
-                    'name': employee['Name'],
-                    'feedback_id': feedback['FeedbackID'].values[0]
+                    'score': self._feedback_by_empid.at[employee_id, 'FeedbackScore'],
+                    'comment': self._feedback_by_empid.at[employee_id, 'Comments']
                 }
-        
-        # Total sales by month
-        elif 'total sales amount' in question_lower and 'january' in question_lower:
-            jan_sales = self.sheets['Sales'].data[
-                self.sheets['Sales'].data['Month'] == '2025-01'
-            ]['SalesAmount'].sum()
+        return None
+    
+    def _handle_employee_department(self, question: str) -> Optional[Dict]:
+        """Department lookup questions"""
+        name = self._extract_name(question)
+        if name:
+            dept = self._emp_by_name.at[name, 'Department']
             return {
-                'type': 'total_sales',
-                'month': 'January 2025',
-                'total': jan_sales
+                'type': 'employee_department',
+                'name': name,
+                'department': dept
             }
-        
-        # Highest total sales employee
-        elif 'highest total sales' in question_lower:
-            if hasattr(self, 'employee_sales'):
-                totals = self.employee_sales.groupby('Name')['SalesAmount'].sum()
-                top_employee = totals.idxmax()
-                top_amount = totals.max()
-                return {
-                    'type': 'top_sales_employee',
-                    'name': top_employee,
-                    'total_sales': top_amount
-                }
-        
-        # Average salary by department
-        elif 'average salary' in question_lower and 'department' in question_lower:
-            dept = self._extract_department(question)
-            if dept:
-                avg = self.sheets['Employees'].data[
-                    self.sheets['Employees'].data['Department'] == dept
-                ]['Salary'].mean()
-                return {
-                    'type': 'avg_salary',
-                    'department': dept,
-                    'average': avg
-                }
-        
-        # Feedback score count
-        elif 'how many employees' in question_lower and 'feedbackscore' in question_lower.replace(' ', ''):
-            if '5' in question:
-                count = len(self.sheets['Feedback'].data[
-                    self.sheets['Feedback'].data['FeedbackScore'] == 5
-                ])
-                return {
-                    'type': 'feedback_count',
-                    'score': 5,
-                    'count': count
-                }
-        
-        # Total payroll
-        elif 'total payroll' in question_lower:
-            total = self.sheets['Employees'].data['Salary'].sum()
+        return None
+    
+    def _handle_sale_amount(self, question: str) -> Optional[Dict]:
+        """Sales amount questions"""
+        if 'saleid' in question.replace(' ', ''):
+            sale_id = int(re.search(r'saleid\s*(\d+)', question).group(1))
+            if sale_id not in self._sales_by_id.index:
+                return None
+            amount = self._sales_by_id.at[sale_id, 'SalesAmount']
             return {
-                'type': 'total_payroll',
-                'total': total
+                'type': 'sale_amount',
+                'sale_id': sale_id,
+                'amount': amount
             }
-        
-        # Highest sales month
-        elif 'highest total sales' in question_lower and 'month' in question_lower:
-            monthly = self.sheets['Sales'].data.groupby('Month')['SalesAmount'].sum()
-            top_month = monthly.idxmax()
-            top_amount = monthly.max()
+        return None
+    
+    def _handle_needs_improvement(self, question: str) -> Optional[Dict]:
+        """Needs improvement feedback"""
+        feedback = self.sheets['Feedback'].data.loc[self._needs_improvement_mask]
+        if not feedback.empty:
+            employee_id = feedback['EmployeeID'].values[0]
             return {
-                'type': 'top_sales_month',
-                'month': top_month,
-                'total': top_amount
+                'type': 'needs_improvement',
+                'name': self._emp_by_id.at[employee_id, 'Name'],
+                'feedback_id': feedback['FeedbackID'].values[0]
             }
-        
-        # Average feedback score
-        elif 'average feedbackscore' in question_lower.replace(' ', ''):
-            avg = self.sheets['Feedback'].data['FeedbackScore'].mean()
+        return None
+    
+    def _handle_total_sales(self, question: str) -> Optional[Dict]:
+        """Total sales by month"""
+        jan_sales = self._monthly_sales[
+            self._monthly_sales.index == '2025-01'
+        ].sum()
+        return {
+            'type': 'total_sales',
+            'month': 'January 2025',
+            'total': jan_sales
+        }
+    
+    def _handle_top_sales_employee(self, question: str) -> Optional[Dict]:
+        """Highest total sales employee"""
+        if 'Employees' in self.sheets and 'Sales' in self.sheets:
+            top_employee = self._emp_sales_totals.idxmax()
+            top_amount = self._emp_sales_totals.max()
             return {
-                'type': 'avg_feedback',
-                'average': avg
+                'type': 'top_sales_employee',
+                'name': top_employee,
+                'total_sales': top_amount
             }
-        
-        # Lowest avg salary department
-        elif 'lowest average salary' in question_lower:
-            dept_avg = self.sheets['Employees'].data.groupby('Department')['Salary'].mean()
-            lowest_dept = dept_avg.idxmin()
-            lowest_avg = dept_avg.min()
+        return None
+    
+    def _handle_avg_salary(self, question: str) -> Optional[Dict]:
+        """Average salary by department"""
+        dept = self._extract_department(question)
+        if dept:
+            avg = self._dept_salary_avg[dept]
             return {
-                'type': 'lowest_avg_salary',
-                'department': lowest_dept,
-                'average': lowest_avg
+                'type': 'avg_salary',
+                'department': dept,
+                'average': avg
             }
-        
-        # Employees hired before year
-        elif 'hired before' in question_lower:
-            year = int(re.search(r'before\s*(\d+)', question_lower).group(1))
-            employees = self.sheets['Employees'].data[
-                pd.to_datetime(self.sheets['Employees'].data['HireDate']).dt.year < year
-            ]
+        return None
+    
+    def _handle_feedback_count(self, question: str) -> Optional[Dict]:
+        """Feedback score count"""
+        if '5' in question:
+            count = self._score_counts.get(5, 0)
             return {
-                'type': 'employees_before_year',
-                'year': year,
-                'count': len(employees),
-                'names': employees['Name'].tolist()
+                'type': 'feedback_count',
+                'score': 5,
+                'count': count
             }
+        return None
+    
+    def _handle_total_payroll(self, question: str) -> Optional[Dict]:
+        """Total payroll"""
+        total = self._total_payroll
+        return {
+            'type': 'total_payroll',
+            'total': total
+        }
+    
+    def _handle_top_sales_month(self, question: str) -> Optional[Dict]:
+        """Highest sales month"""
+        top_month = self._monthly_sales.idxmax()
+        top_amount = self._monthly_sales.max()
+        return {
+            'type': 'top_sales_month',
+            'month': top_month,
+            'total': top_amount
+        }
+    
+    def _handle_avg_feedback(self, question: str) -> Optional[Dict]:
+        """Average feedback score"""
+        avg = self.sheets['Feedback'].data['FeedbackScore'].mean()
+        return {
+            'type': 'avg_feedback',
+            'average': avg
+        }
+    
+    def _handle_lowest_avg_salary(self, question: str) -> Optional[Dict]:
+        """Lowest avg salary department"""
+        lowest_dept = self._dept_salary_avg.idxmin()
+        lowest_avg = self._dept_salary_avg.min()
+        return {
+            'type': 'lowest_avg_salary',
+            'department': lowest_dept,
+            'average': lowest_avg
+        }
+    
+    def _handle_employees_before_year(self, question: str) -> Optional[Dict]:
+        """Employees hired before year"""
+        year = int(re.search(r'before\s*(\d+)', question).group(1))
+        employees = self.sheets['Employees'].data.loc[self._hire_years < year]
+        return {
+            'type': 'employees_before_year',
+            'year': year,
+            'count': len(employees),
+            'names': tuple(employees['Name'].tolist())
+        }
+    
+    def _handle_most_feedback(self, question: str) -> Optional[Dict]:
+        """Employee with most feedback"""
+        top_employee_id = self._feedback_counts.idxmax()
+        top_count = self._feedback_counts.max()
+        return {
+            'type': 'most_feedback',
+            'name': self._emp_by_id.at[top_employee_id, 'Name'],
+            'count': top_count
+        }
+    
+    def _build_matcher(self, values) -> Optional[ahocorasick.Automaton]:
+        """Build an Aho-Corasick automaton mapping lowercased values to (key length, original)"""
+        automaton = ahocorasick.Automaton()
+        for value in values:
+            if pd.isna(value):
+                continue
+            key = str(value).lower()
+            if key and key not in automaton:
+                automaton.add_word(key, (len(key), value))
         
-        # Employee with most feedback
-        elif 'most feedback entries' in question_lower:
-            feedback_counts = self.sheets['Feedback'].data.groupby('EmployeeID').size()
-            top_employee_id = feedback_counts.idxmax()
-            top_count = feedback_counts.max()
-            employee = self.sheets['Employees'].data[
-                self.sheets['Employees'].data['EmployeeID'] == top_employee_id
-            ].iloc[0]
-            return {
-                'type': 'most_feedback',
-                'name': employee['Name'],
-                'count': top_count
-            }
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
+    
+    def _best_match(self, matcher: Optional[ahocorasick.Automaton], question: str):
+        """Return the leftmost-longest whole-word match, else the first match inside a word"""
+        if matcher is None:
+            return None
         
-        return {'type': 'unhandled', 'question': question}
+        fallback = None
+        for end, (length, value) in matcher.iter_long(question):
+            start = end - length + 1
+            before = question[start - 1] if start > 0 else ' '
+            after = question[end + 1] if end + 1 < len(question) else ' '
+            if not before.isalnum() and not after.isalnum():
+                return value
+            if fallback is None:
+                fallback = value
+        return fallback
     
     def _extract_department(self, question: str) -> Optional[str]:
-        """Extract department name from question"""
-        question_lower = question.lower()
-        for dept in self.sheets['Employees'].data['Department'].unique():
-            if dept.lower() in question_lower:
-                return dept
-        return None
+        """Extract department name from a normalized question"""
+        return self._best_match(self._dept_matcher, question)
     
     def _extract_name(self, question: str) -> Optional[str]:
-        """Extract employee name from question"""
-        question_lower = question.lower()
-        for name in self.sheets['Employees'].data['Name'].unique():
-            if name.lower() in question_lower:
-                return name
-        return None
\ No newline at end of file
+        """Extract employee name from a normalized question"""
+        return self._best_match(self._name_matcher, question)
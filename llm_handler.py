@@ -1,30 +1,54 @@
 from groq import Groq
 import os
+from collections import deque
 from typing import Dict, Optional
 from dotenv import load_dotenv
 from data_analyzer import DataAnalyzer
-import json
+import orjson
 from datetime import datetime
 import pandas as pd
+import numpy as np
 
 load_dotenv()
 
-class EnhancedJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (pd.Timestamp, datetime)):
-            return obj.strftime('%Y-%m-%d %H:%M:%S')
-        elif isinstance(obj, pd.DataFrame):
-            return obj.to_dict('records')
-        elif isinstance(obj, pd.Series):
-            return obj.to_dict()
-        return super().default(obj)
+def _json_default(obj):
+    """Serialize the pandas objects orjson doesn't handle natively"""
+    # Ordered by how often each type shows up in sample rows and analysis results
+    if type(obj) is pd.Timestamp:
+        return obj.isoformat()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, pd.DataFrame):
+        return obj.to_dict('records')
+    elif isinstance(obj, pd.Series):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _to_json(obj) -> str:
+    """Pretty-print an object as JSON; numpy scalars are encoded natively"""
+    return orjson.dumps(
+        obj,
+        default=_json_default,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
 
 class LLMHandler:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, analyzer: Optional[DataAnalyzer] = None):
         self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-        self.analyzer = DataAnalyzer(file_path)
+        # Callers that cache parsed files can hand in an existing analyzer
+        self.analyzer = analyzer if analyzer is not None else DataAnalyzer(file_path)
         self.file_path = file_path
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=10)
+        # Sheet structure never changes after load, so serialize it once
+        self._sheets_context_json = _to_json({
+            name: {
+                "columns": sheet.data.columns.tolist(),
+                "sample_data": sheet.data.head(2).to_dict('records')
+            }
+            for name, sheet in self.analyzer.sheets.items()
+        })
     
     def get_answer(self, question: str) -> str:
         """Main method to get answers with conversation history"""
@@ -114,22 +138,18 @@ class LLMHandler:
         # Prepare context
         context = {
             "file": self.file_path,
-            "sheets": {
-                name: {
-                    "columns": sheet.data.columns.tolist(),
-                    "sample_data": json.loads(json.dumps(sheet.data.head(2).to_dict('records'), cls=EnhancedJSONEncoder))
-                }
-                for name, sheet in self.analyzer.sheets.items()
-            },
-            "conversation_history": self.conversation_history[-5:]  # Last 5 messages
+            "conversation_history": list(self.conversation_history)[-5:]  # Last 5 messages
         }
         
         if analysis_result and 'error' not in analysis_result:
-            context['analysis'] = json.loads(json.dumps(analysis_result, cls=EnhancedJSONEncoder))
+            context['analysis'] = analysis_result
         
         try:
-            prompt = f"""You are a data analyst assistant. Given this context:
-            {json.dumps(context, indent=2, cls=EnhancedJSONEncoder)}
+            prompt = f"""You are a data analyst assistant. Given these sheets:
+            {self._sheets_context_json}
+            
+            And this context:
+            {_to_json(context)}
             
             Current question: {question}
             
@@ -152,4 +172,4 @@ class LLMHandler:
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
\ No newline at end of file
+        self.conversation_history.clear()
\ No newline at end of file
@@ -1,20 +1,197 @@
 import streamlit as st
 import os
-from llm_handler import LLMHandler
-from dotenv import load_dotenv
 import tempfile
+import hashlib
+import shutil
+import contextlib
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Tuple
+from dotenv import load_dotenv
+
+# pandas, groq and the analyzer are imported on first upload, keeping first paint light
+if TYPE_CHECKING:
+    import pandas as pd
+    from data_analyzer import DataAnalyzer
 
+# .env may set MAX_UPLOAD_MB, which is read here at import, before llm_handler is loaded
 load_dotenv()
 
+# Largest accepted upload; keep server.maxUploadSize in .streamlit/config.toml in step
+MAX_BYTES = int(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+
+# Session state keys and factories for their initial values; factories keep
+# mutable defaults from being shared between sessions
+_SESSION_DEFAULTS = (
+    ("conversation", list),
+    ("analyzer", lambda: None),
+    ("file_hash", lambda: None),
+    ("upload_id", lambda: None),
+    ("sheet_summary", dict),
+    ("user_turns", lambda: deque(maxlen=5)),
+)
+
+# Chat messages drawn on every rerun; older ones sit behind a toggle
+VISIBLE_MESSAGES = 20
+
+# Built once at import; still emitted on every rerun because Streamlit drops
+# elements a rerun doesn't redraw
+_PAGE_CSS = """
+<style>
+.main-header {
+    text-align: center;
+    padding: 1rem 0;
+    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    border-radius: 10px;
+    margin-bottom: 1rem;
+}
+.top-info-bar {
+    background-color: #f8f9fa;
+    padding: 1rem;
+    border-radius: 8px;
+    border-left: 4px solid #007bff;
+    margin-bottom: 2rem;
+}
+.upload-section {
+    background-color: #f8f9fa;
+    padding: 1.5rem;
+    border-radius: 10px;
+    border: 2px dashed #dee2e6;
+    text-align: center;
+    margin-bottom: 1rem;
+}
+.data-summary {
+    background-color: #e8f5e8;
+    padding: 1rem;
+    border-radius: 8px;
+    border-left: 4px solid #28a745;
+    margin: 1rem 0;
+}
+.conversation-area {
+    background-color: #ffffff;
+    border-radius: 10px;
+    padding: 1rem;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    min-height: 500px;
+    max-height: 600px;
+    overflow-y: auto;
+}
+.stButton > button {
+    width: 100%;
+    margin-top: 1rem;
+    background-color: #dc3545;
+    color: white;
+    border: none;
+    border-radius: 5px;
+    padding: 0.5rem 1rem;
+}
+.stButton > button:hover {
+    background-color: #c82333;
+}
+.sidebar-section {
+    margin-bottom: 2rem;
+    padding-bottom: 1rem;
+    border-bottom: 1px solid #e9ecef;
+}
+.example-questions {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 0.5rem;
+    margin-top: 1rem;
+}
+.example-question {
+    background-color: #e3f2fd;
+    padding: 0.3rem 0.8rem;
+    border-radius: 15px;
+    font-size: 0.9rem;
+    color: #1976d2;
+    border: 1px solid #bbdefb;
+}
+</style>
+"""
+
+_HEADER_HTML = """
+<div class="main-header">
+    <h1>📊 Universal Data Analyst AI</h1>
+    <p>Upload your data and start asking intelligent questions</p>
+</div>
+"""
+
+_EXAMPLE_QUESTIONS = (
+    "What are the top 5 categories?",
+    "Show me trends over time",
+    "What's the correlation between variables?",
+    "Create a summary of the data",
+    "Find outliers in the dataset",
+    "Calculate average by group"
+)
+
+# Display example questions as tags
+_EXAMPLE_QUESTIONS_HTML = (
+    '<div class="example-questions">'
+    + "".join(f'<span class="example-question">{q}</span>' for q in _EXAMPLE_QUESTIONS)
+    + '</div>'
+)
+
 def save_uploaded_file(uploaded_file):
     try:
+        uploaded_file.seek(0)
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1]) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            # Stream in 1 MiB chunks instead of copying the whole upload with getvalue()
+            shutil.copyfileobj(uploaded_file, tmp_file, length=1024 * 1024)
             return tmp_file.name
     except Exception as e:
         st.error(f"Error saving file: {str(e)}")
         return None
 
+@contextlib.contextmanager
+def _section():
+    """Wrap sidebar content in a sidebar-section div"""
+    st.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
+    yield
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Shared across sessions, so bounded: parsed workbooks don't accumulate for the life of the server
+@st.cache_resource(show_spinner=False, max_entries=8, ttl=3600)
+def load_analyzer(file_hash: str, _uploaded_file) -> "DataAnalyzer":
+    """Parse an upload once per distinct content; identical re-uploads reuse it"""
+    from data_analyzer import DataAnalyzer
+    
+    file_path = save_uploaded_file(_uploaded_file)
+    if not file_path:
+        raise ValueError("Could not save the uploaded file")
+    try:
+        return DataAnalyzer(file_path)
+    finally:
+        # Every sheet is read into memory up front, so the copy on disk is no longer needed
+        with contextlib.suppress(OSError):
+            os.unlink(file_path)
+
+@dataclass(frozen=True)
+class SheetSummary:
+    nrows: int
+    ncols: int
+    col_preview: Tuple
+    n_more: int
+    n_numeric: int
+    preview: "pd.DataFrame"
+
+def summarize_sheets(analyzer: "DataAnalyzer") -> Dict[str, SheetSummary]:
+    """Compute the per-sheet figures the UI shows, once per upload"""
+    return {
+        name: SheetSummary(
+            nrows=len(sheet.data),
+            ncols=sheet.data.shape[1],
+            col_preview=tuple(sheet.data.columns[:5]),
+            n_more=max(0, sheet.data.shape[1] - 5),
+            n_numeric=sheet.data.select_dtypes(include='number').shape[1],
+            # st.dataframe converts it only when Preview is clicked, and copes with mixed-type columns
+            preview=sheet.data.head(3)
+        )
+        for name, sheet in analyzer.sheets.items()
+    }
+
 def main():
     # Page config
     st.set_page_config(
@@ -25,98 +202,15 @@ def main():
     )
     
     # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .main-header {
-        text-align: center;
-        padding: 1rem 0;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-    }
-    .top-info-bar {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #007bff;
-        margin-bottom: 2rem;
-    }
-    .upload-section {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 2px dashed #dee2e6;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .data-summary {
-        background-color: #e8f5e8;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #28a745;
-        margin: 1rem 0;
-    }
-    .conversation-area {
-        background-color: #ffffff;
-        border-radius: 10px;
-        padding: 1rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        min-height: 500px;
-        max-height: 600px;
-        overflow-y: auto;
-    }
-    .stButton > button {
-        width: 100%;
-        margin-top: 1rem;
-        background-color: #dc3545;
-        color: white;
-        border: none;
-        border-radius: 5px;
-        padding: 0.5rem 1rem;
-    }
-    .stButton > button:hover {
-        background-color: #c82333;
-    }
-    .sidebar-section {
-        margin-bottom: 2rem;
-        padding-bottom: 1rem;
-        border-bottom: 1px solid #e9ecef;
-    }
-    .example-questions {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 0.5rem;
-        margin-top: 1rem;
-    }
-    .example-question {
-        background-color: #e3f2fd;
-        padding: 0.3rem 0.8rem;
-        border-radius: 15px;
-        font-size: 0.9rem;
-        color: #1976d2;
-        border: 1px solid #bbdefb;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_PAGE_CSS, unsafe_allow_html=True)
 
     # Initialize session state
-    if 'conversation' not in st.session_state:
-        st.session_state.conversation = []
-    if 'analyzer' not in st.session_state:
-        st.session_state.analyzer = None
-    if 'file_path' not in st.session_state:
-        st.session_state.file_path = None
-    if 'processing' not in st.session_state:
-        st.session_state.processing = False
+    for key, factory in _SESSION_DEFAULTS:
+        if key not in st.session_state:
+            st.session_state[key] = factory()
 
     # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>📊 Universal Data Analyst AI</h1>
-        <p>Upload your data and start asking intelligent questions</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
 
     # Create columns for top info
@@ -125,111 +219,104 @@ def main():
     with info_col1:
         if st.session_state.analyzer:
             st.markdown("**📋 Current Data Structure:**")
-            for sheet_name, sheet in st.session_state.analyzer.analyzer.sheets.items():
-                st.markdown(f"• **{sheet_name}**: {len(sheet.data)} rows, {len(sheet.data.columns)} columns")
+            for sheet_name, summary in st.session_state.sheet_summary.items():
+                st.markdown(f"• **{sheet_name}**: {summary.nrows} rows, {summary.ncols} columns")
                 # Show first few column names
-                cols_preview = list(sheet.data.columns)[:5]
-                if len(sheet.data.columns) > 5:
-                    cols_preview.append(f"... (+{len(sheet.data.columns) - 5} more)")
+                cols_preview = list(summary.col_preview)
+                if summary.n_more:
+                    cols_preview.append(f"... (+{summary.n_more} more)")
                 st.markdown(f"  Columns: {', '.join(f'`{col}`' for col in cols_preview)}")
         else:
             st.info("📤 Upload a file to see data structure")
 
     with info_col2:
         st.markdown("**💡 Example Questions:**")
-        example_questions = [
-            "What are the top 5 categories?",
-            "Show me trends over time",
-            "What's the correlation between variables?",
-            "Create a summary of the data",
-            "Find outliers in the dataset",
-            "Calculate average by group"
-        ]
-        
-        # Display example questions as tags
-        questions_html = ""
-        for q in example_questions:
-            questions_html += f'<span class="example-question">{q}</span>'
-        
-        st.markdown(f'<div class="example-questions">{questions_html}</div>', unsafe_allow_html=True)
+        st.markdown(_EXAMPLE_QUESTIONS_HTML, unsafe_allow_html=True)
 
     # Sidebar for file upload, data summary, and controls
     with st.sidebar:
-        st.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
-        st.markdown(" 📁 Data Upload")
-        
         # File upload section
+        with _section():
+            st.markdown(" 📁 Data Upload")
+            st.markdown("**Drop your file here**")
+            uploaded_file = st.file_uploader(
+                "Choose a file", 
+                type=["csv", "xlsx", "xls"],
+                help="Upload CSV or Excel files"
+            )
         
-        st.markdown("**Drop your file here**")
-        uploaded_file = st.file_uploader(
-            "Choose a file", 
-            type=["csv", "xlsx", "xls"],
-            help="Upload CSV or Excel files"
-        )
-        st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        # Reject oversized files before hashing or parsing them
+        if uploaded_file and uploaded_file.size > MAX_BYTES:
+            st.error(f"❌ File exceeds the {MAX_BYTES // 1024 // 1024} MB limit")
+            st.stop()
         
-        # Process uploaded file
-        if uploaded_file and st.session_state.file_path != uploaded_file.name:
+        # Hash each upload once; later reruns short-circuit on the widget's file_id
+        if uploaded_file and st.session_state.upload_id != uploaded_file.file_id:
+            st.session_state.upload_id = uploaded_file.file_id
+            file_hash = hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).hexdigest()
+        else:
+            file_hash = st.session_state.file_hash
+        
+        # Process uploaded file, keyed by content so re-uploads skip parsing
+        if uploaded_file and st.session_state.file_hash != file_hash:
             with st.spinner("Processing file..."):
-                file_path = save_uploaded_file(uploaded_file)
-                if file_path:
-                    st.session_state.file_path = uploaded_file.name
-                    try:
-                        st.session_state.analyzer = LLMHandler(file_path)
-                        st.success("✅ File loaded!")
-                        st.session_state.conversation = []
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Error: {str(e)}")
-
+                try:
+                    from llm_handler import LLMHandler
+                    
+                    analyzer = load_analyzer(file_hash, uploaded_file)
+                    handler = LLMHandler(analyzer.file_path, analyzer=analyzer)
+                    sheet_summary = summarize_sheets(analyzer)
+                    
+                    # Switch the session over only once everything for the new file is built
+                    st.session_state.file_hash = file_hash
+                    st.session_state.analyzer = handler
+                    st.session_state.sheet_summary = sheet_summary
+                    st.success("✅ File loaded!")
+                    st.session_state.conversation = []
+                    st.session_state.user_turns.clear()
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
 
-                    # Data types summary
-                    if hasattr(sheet.data, 'dtypes'):
-                        numeric_cols = len([col for col in sheet.data.columns if sheet.data[col].dtype in ['int64', 'float64']])
-                        text_cols = len(sheet.data.columns) - numeric_cols
-                        
-                        st.markdown("**Data Types:**")
-                        st.markdown(f"• Numeric: {numeric_cols}")
-                        st.markdown(f"• Text: {text_cols}")
+        # Data types summary, counted once per upload in summarize_sheets
+        if st.session_state.sheet_summary:
+            with _section():
+                st.markdown("### 📊 Data Summary")
+                for sheet_name, summary in st.session_state.sheet_summary.items():
+                    st.markdown(f"**{sheet_name}** — Data Types:")
+                    st.markdown(f"• Numeric: {summary.n_numeric}")
+                    st.markdown(f"• Text: {summary.ncols - summary.n_numeric}")
                     
-                    # Quick preview
+                    # Quick preview, only sent when asked for
                     if st.button(f"Preview {sheet_name}", key=f"preview_{sheet_name}"):
-                        st.dataframe(sheet.data.head(3))
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+                        st.dataframe(summary.preview)
 
         # Controls section
-        st.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
-        st.markdown("### ⚙️ Controls")
-        
-        # Status indicator
-        if st.session_state.analyzer:
-            st.success("🟢 AI Ready")
-        else:
-            st.warning("🟡 Upload data to begin")
-        
-        # Clear conversation button
-        if st.button("🗑️ Clear Conversation"):
-            if 'analyzer' in st.session_state and st.session_state.analyzer:
-                st.session_state.analyzer.clear_history()
-            st.session_state.conversation = []
-            st.rerun()
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        with _section():
+            st.markdown("### ⚙️ Controls")
+            
+            # Status indicator
+            if st.session_state.analyzer:
+                st.success("🟢 AI Ready")
+            else:
+                st.warning("🟡 Upload data to begin")
+            
+            # Clear conversation button
+            if st.button("🗑️ Clear Conversation"):
+                if 'analyzer' in st.session_state and st.session_state.analyzer:
+                    st.session_state.analyzer.clear_history()
+                st.session_state.conversation = []
+                st.session_state.user_turns.clear()
+                st.rerun()
 
         # Conversation history in sidebar
         if st.session_state.conversation:
-            st.markdown('<div class="sidebar-section">', unsafe_allow_html=True)
-            st.markdown("### 📜 Conversation History")
-            
-            # Show recent conversations (last 5)
-            recent_conversations = st.session_state.conversation[-10:]
-            for i, message in enumerate(recent_conversations):
-                if message["role"] == "user":
-                    st.markdown(f"**Q{len(recent_conversations)-i}:** {message['content'][:50]}...")
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+            with _section():
+                st.markdown("### 📜 Conversation History")
+                
+                # Show recent questions (last 5), newest first
+                for i, question in enumerate(reversed(st.session_state.user_turns), 1):
+                    st.markdown(f"**Q{i}:** {question}")
 
     # Main area - Conversation
     st.markdown("💬 AI Analysis & Conversation")
@@ -237,7 +324,13 @@ def main():
     
     
     if st.session_state.conversation:
-        for message in st.session_state.conversation:
+        # Only the latest messages are drawn on every rerun; older ones on request
+        earlier = st.session_state.conversation[:-VISIBLE_MESSAGES]
+        if earlier and st.toggle("Show earlier messages"):
+            for message in earlier:
+                with st.chat_message(message["role"]):
+                    st.write(message["content"])
+        for message in st.session_state.conversation[-VISIBLE_MESSAGES:]:
             with st.chat_message(message["role"]):
                 st.write(message["content"])
     else:
@@ -246,33 +339,29 @@ def main():
             st.info("👋 Your data is ready! Ask me anything about it using the input below.")
         else:
             st.info("📤 Please upload a file in the sidebar to start analyzing your data.")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
 
-    # Question input at the bottom
-    if st.session_state.analyzer and not st.session_state.processing:
+    # Question input at the bottom; answered in place within the same run
+    if st.session_state.analyzer:
         question = st.chat_input("Ask a question about your data...", key="main_chat_input")
         
         if question:
-            st.session_state.processing = True
             st.session_state.conversation.append({"role": "user", "content": question})
+            # Truncated once here so the sidebar renders it as-is
+            st.session_state.user_turns.append(question[:50] + "…" if len(question) > 50 else question)
+            with st.chat_message("user"):
+                st.write(question)
+            
+            with st.chat_message("assistant"):
+                with st.spinner("🤔 Analyzing your data..."):
+                    try:
+                        answer = st.session_state.analyzer.get_answer(question)
+                    except Exception as e:
+                        answer = f"❌ Error: {str(e)}"
+                st.write(answer)
+            st.session_state.conversation.append({"role": "assistant", "content": answer})
+            
+            # The sidebar history was drawn before this question arrived
             st.rerun()
 
-    # Process question
-    if st.session_state.processing and st.session_state.analyzer:
-        # Get the last question
-        last_question = next((msg["content"] for msg in reversed(st.session_state.conversation) if msg["role"] == "user"), None)
-        
-        if last_question:
-            with st.spinner("🤔 Analyzing your data..."):
-                try:
-                    answer = st.session_state.analyzer.get_answer(last_question)
-                    st.session_state.conversation.append({"role": "assistant", "content": answer})
-                except Exception as e:
-                    st.session_state.conversation.append({"role": "assistant", "content": f"❌ Error: {str(e)}"})
-                finally:
-                    st.session_state.processing = False
-                    st.rerun()
-
 if __name__ == "__main__":
     main()
\ No newline at end of file